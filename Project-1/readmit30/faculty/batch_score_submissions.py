@@ -12,13 +12,13 @@ Example:
 team,repo_url,ref,nb_path
 TeamA,https://gitlab.myorg.edu/course/team-a.git,final_week6,notebooks/submission.ipynb
 
-This script will:
-1) clone each repo into a work directory
-2) checkout the requested ref
-3) install requirements (optionally per-team venv)
-4) execute the notebook via nbconvert with env vars for TRAIN/DEV/TEST/OUT
+This script will (for up to --jobs teams concurrently):
+1) keep one blobless bare mirror per repo_url (workdir/.bare/<hash>)
+2) fetch the requested ref and check it out as a per-team git worktree (workdir/teams/<team>)
+3) install requirements from a shared wheelhouse (optionally into a venv per requirements hash)
+4) execute the notebook's main section (nbclient) with env vars for TRAIN/DEV/TEST/OUT
 5) score predictions on hidden labels
-6) write/update leaderboard/leaderboard.csv (CSV)
+6) write/update leaderboard/leaderboard.csv (CSV, plus a Parquet copy when pyarrow is available)
 
 Designed to be run by faculty on a machine that has access to:
 - public train/dev (either inside the repo OR via shared path)
@@ -27,18 +27,31 @@ Designed to be run by faculty on a machine that has access to:
 
 import argparse
 import csv
+import hashlib
+import importlib.util
+import json
 import os
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
+import nbformat
 import pandas as pd
+from nbclient import NotebookClient
 
-from score_utils import score_predictions
+import make_site
+from make_submission_notebook import extract_main
+from score_utils import load_labels, score_predictions_arrays
+
+# Parquet copy of the leaderboard is optional (pyarrow isn't a course requirement)
+HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
 
 DEFAULT_NB = "Project-1/readmit30/notebooks/submission.ipynb"
 
@@ -49,171 +62,596 @@ class Submission:
     ref: str
     nb_path: str = DEFAULT_NB
 
-def run(cmd, cwd=None, env=None, check=True):
+def run(cmd, cwd=None, env=None, check=True, log_path: Path | None = None):
     # Use a list-form command for safety
-    return subprocess.run(cmd, cwd=cwd, env=env, check=check, capture_output=True, text=True)
-
-def git_clone(repo_url: str, dest: Path):
-    run(["git", "clone", repo_url, str(dest)])
-
-def git_checkout(repo_dir: Path, ref: str):
-    run(["git", "fetch", "--all", "--tags"], cwd=repo_dir)
-    run(["git", "checkout", ref], cwd=repo_dir)
-
-def install_requirements(repo_dir: Path, python_exe: str):
+    if log_path is None:
+        return subprocess.run(cmd, cwd=cwd, env=env, check=check, capture_output=True, text=True)
+    # Stream chatty tools (git/pip/nbconvert) straight to a log file instead of buffering them
+    with open(log_path, "ab") as f:
+        proc = subprocess.run(cmd, cwd=cwd, env=env, check=False, stdout=f, stderr=subprocess.STDOUT)
+    if check and proc.returncode != 0:
+        # This command was the last writer, so the log tail is its own error output
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=tail_bytes(log_path, 300))
+    return proc
+
+def fast_rmtree(path: Path):
+    # Team checkouts and pending venvs are throwaway: one C-level `rm -rf` beats
+    # shutil.rmtree's per-entry Python stat/unlink on large trees
+    if sys.platform.startswith("linux"):
+        subprocess.run(["rm", "-rf", str(path)], check=False)
+    else:
+        shutil.rmtree(path, ignore_errors=True)
+
+def tmpfs_workdir(workdir: Path) -> Path:
+    """Point workdir (as a symlink) at a fresh directory on /dev/shm, when available."""
+    shm = Path("/dev/shm")
+    if not shm.is_dir():
+        print("  /dev/shm not available; --workdir-tmpfs ignored")
+        return workdir
+    if workdir.is_symlink() and workdir.resolve().is_dir():
+        return workdir  # reuse the tmpfs dir from an earlier run
+    if workdir.exists() and not workdir.is_symlink():
+        print(f"  {workdir} already exists on disk; --workdir-tmpfs ignored")
+        return workdir
+    workdir.unlink(missing_ok=True)  # dangling link (e.g. after a reboot)
+    workdir.parent.mkdir(parents=True, exist_ok=True)
+    workdir.symlink_to(tempfile.mkdtemp(prefix="readmit30-", dir=shm))
+    return workdir
+
+def tail_bytes(path: Path, n: int = 300) -> str:
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - n))
+        return f.read().decode("utf-8", errors="replace")
+
+# One lock per shared path (bare mirror, venv): git and pip both misbehave
+# when two teams write to the same repo/environment concurrently
+_path_locks: dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+def _path_lock(path) -> threading.Lock:
+    with _path_locks_guard:
+        return _path_locks.setdefault(str(path), threading.Lock())
+
+def bare_dir_for(workdir: Path, repo_url: str) -> Path:
+    return workdir / ".bare" / hashlib.sha1(repo_url.encode()).hexdigest()[:12]
+
+def team_dir_for(workdir: Path, team: str) -> Path:
+    # Checkouts live in their own namespace so no team name can collide with (and later
+    # rm -rf) the shared .bare/.venvs/.wheelhouse dirs; path separators and dot-only
+    # names are neutralized so a name can't escape workdir/teams either
+    name = team.replace(" ", "_").replace("/", "_").replace("\\", "_")
+    if name in ("", ".", ".."):
+        name = "_" + name
+    return workdir / "teams" / name
+
+def is_sha_like(ref: str) -> bool:
+    # Branch/tag names can move, so only (possibly abbreviated) commit SHAs may skip the fetch
+    return 7 <= len(ref) <= 40 and all(c in "0123456789abcdef" for c in ref.lower())
+
+def resolve_ref(repo_url: str, ref: str) -> str:
+    """
+    Resolve ref to a commit SHA with a single `git ls-remote`, before anything is cloned.
+    Abbreviated SHAs can't be listed remotely and are returned as-is for the mirror to resolve.
+    Raises ValueError when the ref doesn't exist so bad submissions fail fast.
+    """
+    if len(ref) == 40 and is_sha_like(ref):
+        return ref
+    patterns = [f"refs/tags/{ref}", f"refs/tags/{ref}^{{}}", f"refs/heads/{ref}", ref, f"{ref}^{{}}"]
+    out = run(["git", "ls-remote", repo_url, *patterns], check=False)
+    if out.returncode != 0:
+        raise ValueError(f"git ls-remote failed: {out.stderr.strip()[-250:]}")
+
+    found = {name: sha for sha, name in (line.split("\t", 1) for line in out.stdout.splitlines() if "\t" in line)}
+    # Same precedence as git's own ref lookup; peeled (^{}) entries point annotated tags at commits
+    for name in (f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", f"refs/heads/{ref}"):
+        if name in found:
+            return found[name]
+    # Last resort, the bare pattern: HEAD or a full ref name (e.g. refs/pull/1/head), or else a
+    # unique ref that merely ends in /<ref>
+    for name in (f"{ref}^{{}}", ref):
+        if name in found:
+            return found[name]
+    tails = {sha for name, sha in found.items() if name.endswith(f"/{ref}")}
+    if len(tails) == 1:
+        return tails.pop()
+    if is_sha_like(ref):
+        return ref
+    raise ValueError(f"ref {ref!r} not found in {repo_url}")
+
+def ensure_bare(repo_url: str, bare_dir: Path, ref: str, sha: str, log_path: Path | None = None) -> str:
+    """
+    Make sure a blobless bare mirror of repo_url holds `ref` (pre-resolved to `sha`, see
+    resolve_ref) and return its commit SHA. The mirror is cloned on first sight and shared
+    by every team submitting from that repo.
+    """
+    with _path_lock(bare_dir):
+        if not bare_dir.exists():
+            bare_dir.parent.mkdir(parents=True, exist_ok=True)
+            run(["git", "clone", "--bare", "--filter=blob:none", "--no-tags", repo_url, str(bare_dir)],
+                log_path=log_path)
+
+        # A commit the mirror already has needs no network round-trip
+        found = run(["git", "rev-parse", "--verify", "--quiet", f"{sha}^{{commit}}"], cwd=bare_dir, check=False)
+        if found.returncode == 0:
+            return found.stdout.strip()
+
+        # Fetch just the resolved commit; fall back to the ref name and then an explicit tag
+        # refspec for servers that reject SHA fetches.
+        attempts = [
+            ["git", "fetch", "--no-tags", "origin", sha],
+            ["git", "fetch", "--no-tags", "origin", ref],
+            ["git", "fetch", "--no-tags", "origin", f"refs/tags/{ref}:refs/tags/{ref}"],
+        ]
+        for cmd in attempts:
+            if run(cmd, cwd=bare_dir, check=False, log_path=log_path).returncode == 0:
+                return run(["git", "rev-parse", "FETCH_HEAD^{commit}"], cwd=bare_dir).stdout.strip()
+        return run(["git", "rev-parse", "--verify", f"{ref}^{{commit}}"], cwd=bare_dir).stdout.strip()
+
+def git_worktree_add(bare_dir: Path, team_dir: Path, sha: str, log_path: Path | None = None):
+    with _path_lock(bare_dir):
+        run(["git", "-C", str(bare_dir), "worktree", "add", "--detach", str(team_dir.resolve()), sha],
+            log_path=log_path)
+
+def git_worktree_remove(bare_dir: Path, team_dir: Path):
+    with _path_lock(bare_dir):
+        if bare_dir.exists():
+            run(["git", "-C", str(bare_dir), "worktree", "remove", "--force", str(team_dir.resolve())], check=False)
+            run(["git", "-C", str(bare_dir), "worktree", "prune"], check=False)
+    # Leftovers from a plain clone (or a worktree of a different mirror)
+    fast_rmtree(team_dir)
+
+def requirements_hash(repo_dir: Path) -> str:
+    req = repo_dir / "requirements.txt"
+    return hashlib.sha256(req.read_bytes() if req.exists() else b"").hexdigest()[:16]
+
+def start_venv(base_python: str, venv_dir: Path) -> subprocess.Popen:
+    """Begin creating a venv in the background (it doesn't depend on repo contents)."""
+    fast_rmtree(venv_dir)
+    venv_dir.parent.mkdir(parents=True, exist_ok=True)
+    return subprocess.Popen(
+        [base_python, "-m", "venv", "--symlinks", str(venv_dir)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+
+def ensure_venv(venv_dir: Path, pending_dir: Path, pending: subprocess.Popen, log_path: Path | None = None) -> str:
+    """
+    Return the python of venv_dir (shared by all teams with the same requirements).
+    If it doesn't exist yet, publish the speculatively created pending_dir under that name.
+    """
+    _, err = pending.communicate()
+    if pending.returncode != 0:
+        raise subprocess.CalledProcessError(pending.returncode, pending.args, stderr=err)
+
+    py = str(venv_dir / "bin" / "python")
+    if venv_dir.exists():
+        fast_rmtree(pending_dir)
+        return py
+    run([str(pending_dir / "bin" / "python"), "-m", "pip", "install", "-q", "--upgrade", "pip"], log_path=log_path)
+    # venvs aren't relocatable (script shebangs, activate), so the venv stays where it was
+    # built and venv_dir becomes a symlink to it -- created last, so an interrupted build
+    # is never reused
+    venv_dir.unlink(missing_ok=True)  # dangling link from an earlier, cleaned-up run
+    venv_dir.symlink_to(pending_dir.name)
+    return py
+
+def warm_wheelhouse(python_exe: str, req: Path, wheelhouse: Path, log_path: Path) -> subprocess.Popen:
+    """
+    Build wheels for the course-level requirements in the background; teams install from them.
+    The caller must wait() on or terminate() the returned process before exiting.
+    """
+    cmd = [python_exe, "-m", "pip", "wheel", "-q", "-w", str(wheelhouse), "--find-links", str(wheelhouse),
+           "-r", str(req)]
+    with open(log_path, "ab") as f:
+        return subprocess.Popen(cmd, stdout=f, stderr=subprocess.STDOUT)
+
+def stage_shared_file(src: Path, dest: Path) -> Path:
+    """
+    Copy a caller's data file once into the workdir and make the copy read-only.
+    Team checkouts hardlink to this copy, so the caller's own file is never exposed to
+    (or chmodded by) the batch; an in-place write by one notebook can at worst damage the
+    copy, which is refreshed on the next run.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    shutil.copyfile(src, tmp)
+    tmp.chmod(0o444)
+    os.replace(tmp, dest)
+    return dest
+
+def link_shared_file(src: Path, dest: Path):
+    # Hardlink shared public data (a read-only copy, see stage_shared_file) into a checkout:
+    # one inode for all teams; copy across devices
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy(src, dest)
+
+def install_requirements(repo_dir: Path, python_exe: str, wheelhouse: Path, log_path: Path | None = None,
+                         warm: subprocess.Popen | None = None):
     req = repo_dir / "requirements.txt"
     if not req.exists():
         return
-    run([python_exe, "-m", "pip", "install", "-q", "-r", str(req)], cwd=repo_dir)
 
-def execute_notebook(repo_dir: Path, nb_relpath: str, env: dict, timeout_s: int, out_nb: Path):
+    # Skip entirely if this exact requirements file was already installed into this interpreter
+    key = hashlib.sha256(req.read_bytes() + python_exe.encode()).hexdigest()[:16]
+    marker = wheelhouse / f".installed-{key}"
+    if marker.exists():
+        return
+
+    # Only now do we actually need pip: let the background warm-up finish first
+    if warm is not None:
+        warm.wait()
+
+    # Build/download wheels into the shared wheelhouse once, then install offline from it
+    run([python_exe, "-m", "pip", "wheel", "-q", "-w", str(wheelhouse), "--find-links", str(wheelhouse),
+         "-r", str(req)], cwd=repo_dir, log_path=log_path)
+    run([python_exe, "-m", "pip", "install", "-q", "--no-index", "--find-links", str(wheelhouse), "-r", str(req)],
+        cwd=repo_dir, log_path=log_path)
+    marker.touch()
+
+def execute_notebook(repo_dir: Path, nb_relpath: str, env: dict, timeout_s: int, out_nb: Path | None,
+                     log_path: Path | None = None):
     nb_path = repo_dir / nb_relpath
     if not nb_path.exists():
         raise FileNotFoundError(f"Notebook not found: {nb_path}")
 
-    # modify notebook to extract just main section
-    extractor = Path("make_submission_notebook.py")
-    cmd = [sys.executable, str(extractor),"--input", str(nb_path), "--output", str(nb_path)]
-    subprocess.run(cmd,check=True)
+    # extract just the main section (in-process; no extra interpreter per team)
+    nb = extract_main(nbformat.read(str(nb_path), as_version=4))
+
+    python_exe = env.get("PYTHON_EXE", sys.executable)
+    if python_exe == sys.executable:
+        # Same interpreter: drive the kernel directly instead of cold-starting the jupyter CLI
+        client = NotebookClient(
+            nb, timeout=timeout_s, kernel_name="python3",
+            resources={"metadata": {"path": str(repo_dir)}},
+        )
+        client.execute(env=env)
+        if out_nb is not None:
+            nbformat.write(nb, str(out_nb))
+        return
 
-    # Now run notebook
+    # Different interpreter (e.g. shared venv): its own nbconvert picks the matching kernel
+    nbformat.write(nb, str(nb_path))
+    executed = out_nb or nb_path.with_name(nb_path.stem + ".executed.ipynb")
     cmd = [
-        env.get("PYTHON_EXE", sys.executable),
+        python_exe,
         "-m", "jupyter", "nbconvert",
         "--to", "notebook",
         "--execute", str(nb_path),
         f"--ExecutePreprocessor.timeout={timeout_s}",
-        "--output", str(out_nb),
+        "--output", str(executed.resolve()),
     ]
-    run(cmd, cwd=repo_dir, env=env, check=True)
+    run(cmd, cwd=repo_dir, env=env, check=True, log_path=log_path)
+    if out_nb is None:
+        executed.unlink(missing_ok=True)
 
 def load_submissions(csv_path: Path):
-    subs = []
+    # Positional reader + generator: no per-row dict, and callers may stream
     with csv_path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return  # empty file: no submissions, like DictReader
+        idx = {c.strip(): i for i, c in enumerate(header)}
+        i_team, i_url, i_ref = idx["team"], idx["repo_url"], idx["ref"]
+        i_nb = idx.get("nb_path")
         for row in reader:
-            team = row["team"].strip()
-            repo_url = row["repo_url"].strip()
-            ref = row["ref"].strip()
-            nb_path = row.get("nb_path", DEFAULT_NB).strip() or DEFAULT_NB
-            subs.append(Submission(team=team, repo_url=repo_url, ref=ref, nb_path=nb_path))
-    return subs
-
-def upsert_leaderboard(leaderboard_csv: Path, record: dict):
-    # Keep one row per team (latest submission wins)
-    cols = ["team", "submission", "auroc", "auprc", "brier", "n", "timestamp", "status", "notes"]
-    if leaderboard_csv.exists():
-        df = pd.read_csv(leaderboard_csv)
+            if not row:
+                continue
+            nb_path = row[i_nb].strip() if i_nb is not None and i_nb < len(row) else ""
+            yield Submission(
+                team=row[i_team].strip(),
+                repo_url=row[i_url].strip(),
+                ref=row[i_ref].strip(),
+                nb_path=nb_path or DEFAULT_NB,
+            )
+
+LEADERBOARD_COLS = ["team", "submission", "auroc", "auprc", "brier", "n", "timestamp", "status", "notes"]
+# team/submission are pinned to str so numeric-looking names (e.g. "7") still dedupe against new rows
+LEADERBOARD_DTYPES = {
+    "team": str, "submission": str, "auroc": "float64", "auprc": "float64", "brier": "float64", "n": "Int64",
+}
+
+def write_parquet_copy(df: pd.DataFrame, leaderboard_csv: Path):
+    # Typed, compressed copy for fast re-reads; the CSV stays the human-facing export
+    # (best effort: a failed write must never abort a batch mid-run)
+    lb_parquet = leaderboard_csv.with_suffix(".parquet")
+    if not HAVE_PYARROW:
+        lb_parquet.unlink(missing_ok=True)
+        return
+    try:
+        df.to_parquet(lb_parquet, engine="pyarrow", compression="zstd", index=False)
+    except Exception as e:
+        print(f"Skipping parquet copy ({type(e).__name__}): {e}")
+        lb_parquet.unlink(missing_ok=True)  # never leave a stale copy for readers to prefer
+
+def read_leaderboard(leaderboard_csv: Path) -> pd.DataFrame:
+    # Metric dtypes are fixed at read time so no per-column coercion is needed afterwards.
+    # Reindexing pins the column set (and order) regardless of what the file holds.
+    lb_parquet = leaderboard_csv.with_suffix(".parquet")
+    if lb_parquet.exists() and leaderboard_csv.exists() and lb_parquet.stat().st_mtime >= leaderboard_csv.stat().st_mtime:
+        df = pd.read_parquet(lb_parquet)
+    elif leaderboard_csv.exists():
+        df = pd.read_csv(leaderboard_csv, dtype=LEADERBOARD_DTYPES)
     else:
-        df = pd.DataFrame(columns=cols)
+        df = pd.DataFrame(columns=LEADERBOARD_COLS)
+    return df.reindex(columns=LEADERBOARD_COLS).astype(LEADERBOARD_DTYPES)
 
-    df = df[df["team"] != record["team"]]
-    df = pd.concat([df, pd.DataFrame([record])], ignore_index=True)
+def upsert_leaderboard(leaderboard_csv: Path, records: list[dict]):
+    # Keep one row per team (latest submission wins); merge the whole batch in one pass
+    df = read_leaderboard(leaderboard_csv)
+    new = pd.DataFrame(records, columns=LEADERBOARD_COLS).astype(LEADERBOARD_DTYPES)
+    df = pd.concat([df, new], ignore_index=True).drop_duplicates(subset="team", keep="last")
 
     # Sort for display: AUROC desc, AUPRC desc, Brier asc
-    df["auroc"] = pd.to_numeric(df["auroc"], errors="coerce")
-    df["auprc"] = pd.to_numeric(df["auprc"], errors="coerce")
-    df["brier"] = pd.to_numeric(df["brier"], errors="coerce")
-    df["n"] = pd.to_numeric(df["n"], errors="coerce")
-
     df = df.sort_values(by=["auroc", "auprc", "brier"], ascending=[False, False, True])
     leaderboard_csv.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(leaderboard_csv, index=False)
+    write_parquet_copy(df, leaderboard_csv)
+    return df
+
+def load_graded_commits(path: Path) -> dict[str, str]:
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+def update_graded_commits(path: Path, records: list[dict]):
+    # team -> commit of its last OK run, kept in the workdir so the published leaderboard
+    # doesn't carry internal SHAs; used to skip teams whose ref hasn't moved
+    graded = load_graded_commits(path)
+    for r in records:
+        if r["status"] == "OK" and r.get("commit"):
+            graded[r["team"]] = r["commit"]
+        else:
+            graded.pop(r["team"], None)
+    path.write_text(json.dumps(graded, indent=2, sort_keys=True), encoding="utf-8")
+
+def new_record(sub: Submission) -> dict:
+    ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return {
+        "team": sub.team,
+        "submission": sub.ref,
+        "auroc": None,
+        "auprc": None,
+        "brier": None,
+        "n": None,
+        "timestamp": ts,
+        "status": "ERROR",
+        "notes": "",
+        "commit": None,  # bookkeeping only; not a leaderboard column (see update_graded_commits)
+    }
+
+def process_one(sub: Submission, sha: str, args, labels: pd.Series, warm: subprocess.Popen | None) -> dict:
+    """Check out, install, execute and score a single team; return its leaderboard record."""
+    record = new_record(sub)
+
+    workdir = Path(args.workdir)
+    team_dir = team_dir_for(workdir, sub.team)
+    bare_dir = bare_dir_for(workdir, sub.repo_url)
+    wheelhouse = (workdir / ".wheelhouse").resolve()
+    if team_dir.exists():
+        git_worktree_remove(bare_dir, team_dir)
+
+    # Per-team subprocess log; kept outside team_dir since the worktree needs an empty dir
+    log_path = (workdir / "logs" / f"{team_dir.name}.build.log").resolve()
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path.unlink(missing_ok=True)
+
+    # Overlap venv creation with the git work below; it is promoted or discarded once
+    # the requirements hash is known
+    pending_dir = (workdir / ".venvs" / f"env-{team_dir.name}-{uuid.uuid4().hex[:8]}").resolve()
+    pending = None
+    venv_dir = None
+
+    try:
+        print(f"== {sub.team} :: {sub.ref} ==")
+        if args.use_venv:
+            pending = start_venv(args.python, pending_dir)
+        sha = ensure_bare(sub.repo_url, bare_dir, sub.ref, sha, log_path)
+        record["commit"] = sha
+        git_worktree_add(bare_dir, team_dir, sha, log_path)
+
+        # Notebooks that hardcode the in-repo data paths still see the shared files
+        if args.train_path:
+            link_shared_file(Path(args.train_path), team_dir / "data/public/train.csv")
+        if args.dev_path:
+            link_shared_file(Path(args.dev_path), team_dir / "data/public/dev.csv")
+
+        if args.use_venv:
+            # Teams with identical requirements share one venv
+            venv_dir = (workdir / ".venvs").resolve() / requirements_hash(team_dir)
+            with _path_lock(venv_dir):
+                python_exe = ensure_venv(venv_dir, pending_dir, pending, log_path)
+                install_requirements(team_dir, python_exe, wheelhouse, log_path, warm)
+        else:
+            python_exe = args.python
+            with _path_lock(python_exe):
+                install_requirements(team_dir, python_exe, wheelhouse, log_path, warm)
+
+        # Notebook execution env vars
+        env = os.environ.copy()
+        env["PYTHON_EXE"] = python_exe
+        env["TEST_PATH"] = str(Path(args.hidden_test).resolve())
+        env["OUT_PATH"] = str((team_dir / "predictions.csv").resolve())
+
+        # Prefer repo-provided public paths unless overridden
+        if args.train_path:
+            env["TRAIN_PATH"] = str(Path(args.train_path).resolve())
+        else:
+            env["TRAIN_PATH"] = str((team_dir / "data/public/train.csv").resolve())
+
+        if args.dev_path:
+            env["DEV_PATH"] = str(Path(args.dev_path).resolve())
+        else:
+            env["DEV_PATH"] = str((team_dir / "data/public/dev.csv").resolve())
+
+        out_nb = team_dir / "executed.ipynb" if args.save_executed else None
+        execute_notebook(team_dir, sub.nb_path, env, args.timeout, out_nb, log_path)
+
+        # Score
+        scores = score_predictions_arrays(labels, env["OUT_PATH"])
+        record.update({
+            "auroc": scores["auroc"],
+            "auprc": scores["auprc"],
+            "brier": scores["brier"],
+            "n": scores["n"],
+            "status": "OK",
+            "notes": "",
+        })
+
+    except Exception as e:
+        # A failed subprocess only says "returned non-zero exit status"; add what it printed:
+        # the log tail for logged commands (see run), otherwise its captured stderr
+        if isinstance(e, subprocess.CalledProcessError) and e.output and e.stderr is None:
+            record["notes"] = e.output
+        elif isinstance(e, subprocess.CalledProcessError) and e.stderr:
+            record["notes"] = f"{e} {e.stderr.strip()}"[:300]
+        else:
+            record["notes"] = str(e)[:300]
+        print(f"  ERROR: {e}")
+
+    finally:
+        if pending is not None and pending.poll() is None:
+            pending.wait()
+        promoted = venv_dir is not None and venv_dir.is_symlink() and venv_dir.resolve() == pending_dir
+        if pending_dir.exists() and not promoted:
+            fast_rmtree(pending_dir)
+
+    return record
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--submissions", required=True, help="CSV with team repo refs.")
     ap.add_argument("--hidden-test", required=True, help="Faculty-only features CSV (includes row_id).")
     ap.add_argument("--hidden-labels", required=True, help="Faculty-only labels CSV (row_id, readmit30).")
-    ap.add_argument("--train-path", default="", help="Optional override for TRAIN_PATH passed to notebooks.")
-    ap.add_argument("--dev-path", default="", help="Optional override for DEV_PATH passed to notebooks.")
+    ap.add_argument("--train-path", default="",
+                    help="Optional override for TRAIN_PATH passed to notebooks (copied once, read-only, and hardlinked into each repo).")
+    ap.add_argument("--dev-path", default="",
+                    help="Optional override for DEV_PATH passed to notebooks (copied once, read-only, and hardlinked into each repo).")
     ap.add_argument("--timeout", type=int, default=10000)
     ap.add_argument("--workdir", default="faculty_workdir", help="Where to checkout repos.")
-    ap.add_argument("--use-venv", action="store_true", help="Create a per-team venv for isolation (slower).")
-    ap.add_argument("--python", default=sys.executable, help="Base python to use (ignored if --use-venv).")
+    ap.add_argument("--workdir-tmpfs", action="store_true",
+                    help="Place --workdir on /dev/shm (symlinked) for faster, fsync-free I/O. Not kept across reboots.")
+    ap.add_argument("--use-venv", action="store_true", help="Install into venvs shared per unique requirements.txt (isolated from --python).")
+    ap.add_argument("--python", default=sys.executable, help="Base python to use (seeds the venvs if --use-venv).")
+    ap.add_argument("--save-executed", action="store_true", help="Keep each team's executed.ipynb.")
+    ap.add_argument("--force-rerun", action="store_true",
+                    help="Re-grade teams even if their ref is already scored OK (e.g. hidden labels changed).")
     ap.add_argument("--leaderboard", default="leaderboard/leaderboard.csv")
-    ap.add_argument("--make-site", action="store_true", help="Run leaderboard/make_site.py after scoring.")
+    ap.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                    help="Number of teams to process concurrently.")
+    ap.add_argument("--checkpoint-every", type=int, default=5,
+                    help="Also flush the leaderboard after every N finished teams (0 = only at the end).")
+    ap.add_argument("--make-site", action="store_true", help="Rebuild the site (make_site.py) after scoring.")
     args = ap.parse_args()
 
-    subs = load_submissions(Path(args.submissions))
+    # One run per team (last row wins, as before): concurrent runs of the same team would
+    # fight over its team_dir and build log
+    subs = list({sub.team: sub for sub in load_submissions(Path(args.submissions))}.values())
     workdir = Path(args.workdir)
+    if args.workdir_tmpfs:
+        workdir = tmpfs_workdir(workdir)
     workdir.mkdir(parents=True, exist_ok=True)
 
-    leaderboard_csv = Path(args.leaderboard)
+    # Mirrors and checkouts are disposable, so don't make git fsync what it writes
+    # (appended via GIT_CONFIG_COUNT so any caller-provided overrides survive)
+    n = int(os.environ.get("GIT_CONFIG_COUNT", "0"))
+    os.environ[f"GIT_CONFIG_KEY_{n}"] = "core.fsync"
+    os.environ[f"GIT_CONFIG_VALUE_{n}"] = "none"
+    os.environ["GIT_CONFIG_COUNT"] = str(n + 1)
 
-    for sub in subs:
-        ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
-        record = {
-            "team": sub.team,
-            "submission": sub.ref,
-            "auroc": "",
-            "auprc": "",
-            "brier": "",
-            "n": "",
-            "timestamp": ts,
-            "status": "ERROR",
-            "notes": "",
-        }
-
-        team_dir = workdir / f"{sub.team}".replace(" ", "_")
-        if team_dir.exists():
-            shutil.rmtree(team_dir)
-
-        try:
-            print(f"== {sub.team} :: {sub.ref} ==")
-            git_clone(sub.repo_url, team_dir)
-            git_checkout(team_dir, sub.ref)
-
-            if args.use_venv:
-                venv_dir = team_dir / ".venv"
-                run([args.python, "-m", "venv", str(venv_dir)])
-                py = str(venv_dir / "bin" / "python")
-                run([py, "-m", "pip", "install", "-q", "--upgrade", "pip"])
-                install_requirements(team_dir, py)
-                python_exe = py
-            else:
-                install_requirements(team_dir, args.python)
-                python_exe = args.python
-
-            # Notebook execution env vars
-            env = os.environ.copy()
-            env["PYTHON_EXE"] = python_exe
-            env["TEST_PATH"] = str(Path(args.hidden_test).resolve())
-            env["OUT_PATH"] = str((team_dir / "predictions.csv").resolve())
-
-            # Prefer repo-provided public paths unless overridden
-            if args.train_path:
-                env["TRAIN_PATH"] = str(Path(args.train_path).resolve())
-            else:
-                env["TRAIN_PATH"] = str((team_dir / "data/public/train.csv").resolve())
-
-            if args.dev_path:
-                env["DEV_PATH"] = str(Path(args.dev_path).resolve())
-            else:
-                env["DEV_PATH"] = str((team_dir / "data/public/dev.csv").resolve())
-
-            out_nb = team_dir / "executed.ipynb"
-            execute_notebook(team_dir, sub.nb_path, env, args.timeout, out_nb)
-
-            # Score
-            scores = score_predictions(args.hidden_labels, env["OUT_PATH"])
-            record.update({
-                "auroc": scores["auroc"],
-                "auprc": scores["auprc"],
-                "brier": scores["brier"],
-                "n": scores["n"],
-                "status": "OK",
-                "notes": "",
-            })
-
-        except Exception as e:
-            record["notes"] = str(e)[:300]
-            print(f"  ERROR: {e}")
+    # Shared pip cache + wheelhouse so identical dependencies are downloaded once per batch
+    os.environ["PIP_CACHE_DIR"] = str((workdir / ".pip-cache").resolve())
+    (workdir / ".wheelhouse").mkdir(exist_ok=True)
 
-        upsert_leaderboard(leaderboard_csv, record)
+    leaderboard_csv = Path(args.leaderboard)
+    if not HAVE_PYARROW:
+        print("pyarrow not installed; writing the leaderboard as CSV only.")
+
+    # Teams link to (and read TRAIN_PATH/DEV_PATH from) read-only copies under workdir/.shared
+    if args.train_path:
+        args.train_path = str(stage_shared_file(Path(args.train_path), workdir / ".shared" / "train.csv"))
+    if args.dev_path:
+        args.dev_path = str(stage_shared_file(Path(args.dev_path), workdir / ".shared" / "dev.csv"))
+
+    # Commits already graded OK per team (still OK on the leaderboard for the same ref);
+    # matched against resolved refs below so a branch that moved since it was scored is re-graded
+    graded_json = workdir / "graded_commits.json"
+    ok_refs: dict[str, str] = {}
+    scored: dict[str, str] = {}
+    if not args.force_rerun:
+        lb = read_leaderboard(leaderboard_csv)
+        ok_refs = {r.team: r.submission for r in lb.itertuples() if r.status == "OK"}
+        scored = {team: c for team, c in load_graded_commits(graded_json).items() if team in ok_refs}
+
+    # Hidden labels are identical for every team: parse them once up front
+    labels = load_labels(args.hidden_labels)
+
+    # Warm the wheelhouse with the course requirements while the first teams are cloning.
+    # Only under --use-venv: that's when fresh environments are certain to need pip.
+    course_req = Path(__file__).resolve().parent.parent / "requirements.txt"
+    warm = None
+    if args.use_venv and course_req.exists():
+        warm = warm_wheelhouse(args.python, course_req, (workdir / ".wheelhouse").resolve(),
+                               (workdir / "warm_wheelhouse.log").resolve())
+
+    # Teams are independent and each step is subprocess/I/O bound, so threads suffice.
+    # Records are collected on this (main) thread and the leaderboard is written once at the
+    # end, plus every --checkpoint-every teams so a crash mid-batch doesn't lose results.
+    try:
+        records = []
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            # Resolve every distinct (repo_url, ref) once; unknown refs are recorded without cloning
+            keys = list(dict.fromkeys((sub.repo_url, sub.ref) for sub in subs))
+            lookups = {key: pool.submit(resolve_ref, *key) for key in keys}
+            resolved: dict[tuple[str, str], str] = {}
+            unresolved: dict[tuple[str, str], str] = {}
+            for key, fut in lookups.items():
+                try:
+                    resolved[key] = fut.result()
+                except ValueError as e:
+                    unresolved[key] = str(e)[:300]
+                except Exception as e:  # e.g. git missing: fail this (repo, ref), not the batch
+                    unresolved[key] = f"{type(e).__name__}: {e}"[:300]
+
+            futures = []
+            for sub in subs:
+                key = (sub.repo_url, sub.ref)
+                # resolve_ref may return an abbreviated SHA; the stored commit is always full
+                already = (key in resolved and ok_refs.get(sub.team) == sub.ref
+                           and scored.get(sub.team, "").startswith(resolved[key]))
+                if already:
+                    print(f"== {sub.team} :: {sub.ref} == already scored at {scored[sub.team][:12]}; "
+                          "skipping (use --force-rerun)")
+                elif key in resolved:
+                    futures.append(pool.submit(process_one, sub, resolved[key], args, labels, warm))
+                else:
+                    record = new_record(sub)
+                    record["notes"] = unresolved[key]
+                    print(f"== {sub.team} :: {sub.ref} ==\n  ERROR: {record['notes']}")
+                    records.append(record)
+
+            for fut in as_completed(futures):
+                records.append(fut.result())
+                if args.checkpoint_every and len(records) % args.checkpoint_every == 0:
+                    upsert_leaderboard(leaderboard_csv, records)
+                    update_graded_commits(graded_json, records)
+    finally:
+        # Never leave a pip child writing into the wheelhouse after we exit
+        if warm is not None and warm.poll() is None:
+            warm.terminate()
+            warm.wait()
+
+    final_df = None
+    if records:
+        final_df = upsert_leaderboard(leaderboard_csv, records)
+        update_graded_commits(graded_json, records)
 
     if args.make_site:
-        run([sys.executable, "make_site.py"], cwd=Path.cwd())
+        # Render in-process from the leaderboard we just wrote instead of re-reading it
+        make_site.main(df=final_df)
         print("Site rebuilt (docs/index.html).")
 
     print(f"Done. Leaderboard: {leaderboard_csv}")
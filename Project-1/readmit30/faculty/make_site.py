@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from pathlib import Path
 import os
+import numpy as np
 import pandas as pd
 
 TEMPLATE = """<!doctype html>
@@ -131,37 +132,52 @@ def render_leaderboard_image(df_sorted: pd.DataFrame, out_png: Path, max_rows: i
     plt.close(fig)
 
 
-def main():
+def main(df: pd.DataFrame | None = None):
+    """
+    Rebuild docs/index.html and the PNG. Callers that already hold the (sorted)
+    leaderboard can pass it as `df` to skip re-reading leaderboard/leaderboard.csv.
+    """
     lb_csv = Path("leaderboard/leaderboard.csv")
     out_html = Path("docs/index.html")
     out_html.parent.mkdir(parents=True, exist_ok=True)
 
-    if not lb_csv.exists():
+    if df is None and not lb_csv.exists():
         out_html.write_text(TEMPLATE.replace("{table}", "<p>No submissions yet.</p>"), encoding="utf-8")
         render_leaderboard_image(pd.DataFrame(), IMG_OUT, max_rows=IMG_MAX_ROWS, dpi=IMG_DPI)
         print(f"Wrote {out_html} (empty)")
         print(f"Wrote {IMG_OUT} (empty)")
         return
 
-    df = pd.read_csv(lb_csv)
-
-    # Sort: AUROC desc, AUPRC desc, Brier asc (NaNs go last)
-    for col in ["auroc", "auprc", "brier"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    sort_cols = [c for c in ["auroc", "auprc", "brier"] if c in df.columns]
-    sort_asc = [False, False, True][: len(sort_cols)]  # matches the above order
-    df_sorted = df.sort_values(by=sort_cols, ascending=sort_asc) if sort_cols else df
+    if df is not None:
+        df_sorted = df
+    else:
+        # Prefer the typed Parquet copy written by batch_score_submissions unless the CSV is newer;
+        # its metric columns are already numeric, so only the CSV needs coercion
+        lb_parquet = lb_csv.with_suffix(".parquet")
+        if lb_parquet.exists() and lb_parquet.stat().st_mtime >= lb_csv.stat().st_mtime:
+            df = pd.read_parquet(lb_parquet)
+        else:
+            df = pd.read_csv(lb_csv)
+            for col in ["auroc", "auprc", "brier"]:
+                if col in df.columns:
+                    df[col] = pd.to_numeric(df[col], errors="coerce")
+
+        # Sort: AUROC desc, AUPRC desc, Brier asc (NaNs go last)
+
+        sort_cols = [c for c in ["auroc", "auprc", "brier"] if c in df.columns]
+        sort_asc = [False, False, True][: len(sort_cols)]  # matches the above order
+        df_sorted = df.sort_values(by=sort_cols, ascending=sort_asc) if sort_cols else df
 
     # HTML version gets colored status spans; image version uses plain "OK"/other text
     df_html = df_sorted.copy()
     if "status" in df_html.columns:
-        df_html["status"] = df_html["status"].apply(
-            lambda s: "<span class='ok'>OK</span>" if s == "OK" else f"<span class='err'>{s}</span>"
+        status = df_html["status"].astype(str)
+        df_html["status"] = np.where(
+            status.to_numpy() == "OK", "<span class='ok'>OK</span>", "<span class='err'>" + status + "</span>"
         )
 
-    table_html = df_html.to_html(index=False, escape=False)
+    # Typed frames (batch runner, Parquet) hold pd.NA, which escape=False would emit as a raw <NA> tag
+    table_html = df_html.to_html(index=False, escape=False, na_rep="")
     html = TEMPLATE.replace("{table}", table_html)
     out_html.write_text(html, encoding="utf-8")
     print(f"Wrote {out_html}")
@@ -84,21 +84,22 @@ def _find_marker_indices(nb, start_marker: str, end_marker: str) -> tuple[int, i
     return start_idx, end_idx
 
 
-def extract_submission_notebook(
-    input_path: Path,
-    output_path: Path,
+def extract_main(
+    nb,
     start_marker: str = "#MAINSTART",
     end_marker: str = "#MAINEND",
     include_marker_cells: bool = False,
     clear_outputs: bool = True,
     clear_execution_counts: bool = True,
-) -> None:
+    marker_indices: tuple[int, int] | None = None,
+):
     """
-    Create output notebook from the section between marker cells.
+    Return a new notebook holding only the section between marker cells.
+    Pass marker_indices (from _find_marker_indices) to skip re-scanning for the markers.
     """
-    nb = nbformat.read(str(input_path), as_version=4)
-
-    start_idx, end_idx = _find_marker_indices(nb, start_marker, end_marker)
+    if marker_indices is None:
+        marker_indices = _find_marker_indices(nb, start_marker, end_marker)
+    start_idx, end_idx = marker_indices
 
     if include_marker_cells:
         selected_cells = nb.cells[start_idx : end_idx + 1]
@@ -122,6 +123,31 @@ def extract_submission_notebook(
     )
     out_nb.nbformat = nb.nbformat
     out_nb.nbformat_minor = nb.nbformat_minor
+    return out_nb
+
+
+def extract_submission_notebook(
+    input_path: Path,
+    output_path: Path,
+    start_marker: str = "#MAINSTART",
+    end_marker: str = "#MAINEND",
+    include_marker_cells: bool = False,
+    clear_outputs: bool = True,
+    clear_execution_counts: bool = True,
+) -> None:
+    """
+    Create output notebook from the section between marker cells.
+    """
+    nb = nbformat.read(str(input_path), as_version=4)
+
+    start_idx, end_idx = _find_marker_indices(nb, start_marker, end_marker)
+    out_nb = extract_main(
+        nb,
+        include_marker_cells=include_marker_cells,
+        clear_outputs=clear_outputs,
+        clear_execution_counts=clear_execution_counts,
+        marker_indices=(start_idx, end_idx),
+    )
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     nbformat.write(out_nb, str(output_path))
@@ -1,16 +1,26 @@
+import numpy as np
 import pandas as pd
 from sklearn.metrics import roc_auc_score, average_precision_score, brier_score_loss
 
-def score_predictions(hidden_labels_csv: str, predictions_csv: str):
-    y = pd.read_csv(hidden_labels_csv)          # row_id, readmit30
-    p = pd.read_csv(predictions_csv)            # row_id, prob_readmit30
+def load_labels(hidden_labels_csv: str) -> pd.Series:
+    # row_id -> readmit30; parse once and reuse across every team's predictions
+    y = pd.read_csv(hidden_labels_csv, usecols=["row_id", "readmit30"], engine="c")
+    return pd.Series(y["readmit30"].astype(int).to_numpy(), index=y["row_id"].to_numpy())
+
+def score_predictions_arrays(labels: pd.Series, predictions_csv: str):
+    p = pd.read_csv(                            # row_id, prob_readmit30
+        predictions_csv,
+        usecols=["row_id", "prob_readmit30"],
+        dtype={"row_id": np.int64, "prob_readmit30": np.float64},
+        engine="c",
+    )
 
-    merged = y.merge(p, on="row_id", how="inner")
-    if len(merged) != len(y):
+    p = p[p["row_id"].isin(labels.index)]
+    if p["row_id"].duplicated().any() or len(p) != len(labels):
         raise ValueError("Predictions missing row_ids or duplicated row_ids.")
 
-    y_true = merged["readmit30"].astype(int).values
-    y_prob = merged["prob_readmit30"].astype(float).values
+    y_true = labels.reindex(p["row_id"].to_numpy()).to_numpy()
+    y_prob = p["prob_readmit30"].to_numpy()
 
     return {
         "auroc": float(roc_auc_score(y_true, y_prob)),
@@ -18,3 +28,6 @@ def score_predictions(hidden_labels_csv: str, predictions_csv: str):
         "brier": float(brier_score_loss(y_true, y_prob)),
         "n": int(len(y_true)),
     }
+
+def score_predictions(hidden_labels_csv: str, predictions_csv: str):
+    return score_predictions_arrays(load_labels(hidden_labels_csv), predictions_csv)
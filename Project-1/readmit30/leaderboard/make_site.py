@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 TEMPLATE = """<!doctype html>
@@ -46,7 +47,8 @@ def main():
 
     # Make status nicer
     if "status" in df.columns:
-        df["status"] = df["status"].apply(lambda s: f"<span class='ok'>OK</span>" if s == "OK" else f"<span class='err'>{s}</span>")
+        status = df["status"].astype(str)
+        df["status"] = np.where(status.to_numpy() == "OK", "<span class='ok'>OK</span>", "<span class='err'>" + status + "</span>")
 
     table = df.to_html(index=False, escape=False)
     out.write_text(TEMPLATE.format(table=table), encoding="utf-8")